@@ -10,14 +10,189 @@ Uses CPU-friendly models that work well on AMD/Intel systems.
 import json
 import os
 import argparse
-from typing import List, Dict, Any, Tuple
+import gzip
+import hashlib
+import pickle
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import List, Dict, Any, Tuple, NamedTuple
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+from tqdm import tqdm
 import faiss
-from transformers import pipeline
+from transformers import AutoTokenizer, pipeline
 import warnings
 warnings.filterwarnings("ignore")
 
+try:
+    import orjson  # Optional: faster JSON parsing for large scrapes
+except ImportError:
+    orjson = None
+
+# Example questions shown by the interactive 'help' command
+EXAMPLE_QUESTIONS = (
+    "How do I add a step to an existing configuration?",
+    "What are the different types of build triggers?",
+    "How do I set up email notifications?",
+    "What is the difference between build configurations and build steps?",
+)
+
+# Corpus sizes at which exact fp32 search gives way to int8 vectors,
+# then to an IVF-PQ index
+SQ8_MIN_DOCUMENTS = 5_000
+IVFPQ_MIN_DOCUMENTS = 10_000
+IVFPQ_SUBQUANTIZERS = 16
+
+# Sentences per encoder forward pass when embedding the corpus
+EMBEDDING_BATCH_SIZE = 64
+
+QA_MODEL_NAME = "distilbert-base-cased-distilled-squad"
+
+# Model input window: [CLS] question [SEP] context [SEP]
+QA_MAX_SEQ_LEN = 512
+QA_DOC_STRIDE = 128
+
+# Answers remembered by ask(); near-duplicate questions above the cosine
+# threshold reuse a previous answer
+ANSWER_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.97
+
+# Local directory for derived artifacts (exported models, indexes)
+CACHE_DIR = ".rag_cache"
+
+
+def load_qa_pipeline(model_name: str = QA_MODEL_NAME, cache_dir: str = CACHE_DIR):
+    """
+    Load the extractive QA pipeline, preferring an INT8 ONNX Runtime build.
+    
+    The model is exported to ONNX, graph-optimized (O2) and dynamically
+    quantized once, then reused from cache_dir. Falls back to the PyTorch
+    model when optimum/onnxruntime are not installed.
+    
+    Args:
+        model_name: Hugging Face QA model to load
+        cache_dir: Directory holding the exported ONNX models
+        
+    Returns:
+        A transformers question-answering pipeline
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForQuestionAnswering, ORTOptimizer, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoOptimizationConfig, AutoQuantizationConfig
+    except ImportError:
+        print("optimum[onnxruntime] not installed, using PyTorch QA model")
+        return pipeline("question-answering", model=model_name, tokenizer=model_name)
+    
+    optimized_dir = os.path.join(cache_dir, f"{model_name}-onnx-o2")
+    quantized_dir = os.path.join(cache_dir, f"{model_name}-onnx-int8")
+    quantized_file = "model_optimized_quantized.onnx"
+    
+    if not os.path.exists(os.path.join(quantized_dir, quantized_file)):
+        print("Exporting QA model to ONNX (first run only)...")
+        model = ORTModelForQuestionAnswering.from_pretrained(model_name, export=True)
+        ORTOptimizer.from_pretrained(model).optimize(
+            save_dir=optimized_dir,
+            optimization_config=AutoOptimizationConfig.O2()
+        )
+        ORTQuantizer.from_pretrained(optimized_dir, file_name="model_optimized.onnx").quantize(
+            save_dir=quantized_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False)
+        )
+    
+    model = ORTModelForQuestionAnswering.from_pretrained(quantized_dir, file_name=quantized_file)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline("question-answering", model=model, tokenizer=tokenizer)
+
+
+class ORTSentenceEncoder:
+    """INT8 ONNX Runtime sentence encoder exposing SentenceTransformer's encode()."""
+    
+    def __init__(self, model, tokenizer, max_length: int = 256):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+    
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        """Mean-pool token embeddings into one float32 vector per sentence."""
+        embeddings = np.zeros((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        batches = range(0, len(sentences), batch_size)
+        for start in tqdm(batches, desc="Batches", disable=not show_progress_bar):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors='np'
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs['attention_mask'][..., None].astype(np.float32)
+            embeddings[start:start + batch_size] = (
+                (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            )
+        
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        
+        return embeddings
+
+
+def load_embedding_model(model_name: str, device: str = 'cpu', cache_dir: str = CACHE_DIR):
+    """
+    Load the sentence embedding model, preferring an INT8 ONNX Runtime build on CPU.
+    
+    The model is exported to ONNX and dynamically quantized once, then reused
+    from cache_dir. GPUs, or a missing optimum/onnxruntime, use the PyTorch
+    SentenceTransformer instead.
+    
+    Args:
+        model_name: Sentence transformer model name
+        device: 'cpu' or 'cuda'
+        cache_dir: Directory holding the exported ONNX models
+        
+    Returns:
+        An object with SentenceTransformer's encode() interface
+    """
+    if device != 'cpu':
+        return SentenceTransformer(model_name, device=device)
+    
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    except ImportError:
+        return SentenceTransformer(model_name, device=device)
+    
+    hub_name = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+    local_name = hub_name.replace('/', '_')
+    exported_dir = os.path.join(cache_dir, f"{local_name}-onnx")
+    quantized_dir = os.path.join(cache_dir, f"{local_name}-onnx-int8")
+    quantized_file = "model_quantized.onnx"
+    
+    if not os.path.exists(os.path.join(quantized_dir, quantized_file)):
+        print("Exporting embedding model to ONNX (first run only)...")
+        ORTModelForFeatureExtraction.from_pretrained(hub_name, export=True).save_pretrained(exported_dir)
+        ORTQuantizer.from_pretrained(exported_dir, file_name="model.onnx").quantize(
+            save_dir=quantized_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False)
+        )
+    
+    model = ORTModelForFeatureExtraction.from_pretrained(quantized_dir, file_name=quantized_file)
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    return ORTSentenceEncoder(model, tokenizer)
+
+
+class Hit(NamedTuple):
+    """A retrieved document, referenced by its position in QuickBuildRAG.documents."""
+    doc_idx: int
+    score: float
+    rank: int
+
+
 class QuickBuildRAG:
     def __init__(self, json_path: str, model_name: str = "all-MiniLM-L6-v2"):
         """
@@ -34,92 +209,260 @@ class QuickBuildRAG:
         self.index = None
         self.embedding_model = None
         self.qa_pipeline = None
+        self.tokenizer = None
+        
+        # Exact-match and embedding-similarity answer caches for ask()
+        self._answer_cache = OrderedDict()
+        self._semantic_embeddings = None
+        self._semantic_top_k = np.zeros(ANSWER_CACHE_SIZE, dtype=np.int64)
+        self._semantic_results = []
+        self._semantic_next = 0
+        
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         
         print(f"Initializing QuickBuild RAG system...")
-        print(f"Using embedding model: {model_name}")
+        print(f"Using embedding model: {model_name} ({self.device})")
+        
+        # Load sentence embedding model (INT8 ONNX on CPU, uses GPU if present)
+        self.embedding_model = load_embedding_model(model_name, self.device)
         
-        # Load and process documents
-        self._load_documents()
-        self._create_embeddings()
+        # Load and process documents, reusing cached embeddings when the
+        # scraped JSON and embedding model are unchanged
+        self.cache_dir = self._cache_dir()
+        if not self._load_cache():
+            self._load_documents()
+            self._create_embeddings()
+            self._save_cache()
         self._setup_qa_pipeline()
         
         print(f"RAG system ready! Loaded {len(self.documents)} document sections.")
     
+    def _cache_dir(self) -> str:
+        """Cache directory keyed by the embedding model, then the scraped JSON contents."""
+        # Quantized and fp32 encoders produce different vectors; never mix them
+        model_key = f"{self.model_name}:{type(self.embedding_model).__name__}"
+        model_digest = hashlib.sha256(model_key.encode()).hexdigest()[:16]
+        with open(self.json_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return os.path.join(CACHE_DIR, model_digest, digest)
+    
+    def _previous_embeddings(self, dimension: int) -> Tuple[Dict[bytes, int], np.ndarray]:
+        """
+        Find the embeddings of the latest complete cache entry for this model.
+        
+        Args:
+            dimension: Embedding dimension of the current model
+            
+        Returns:
+            Map from section content hash to row, and the memory-mapped
+            embeddings; empty when there is nothing to reuse
+        """
+        model_dir = os.path.dirname(self.cache_dir)
+        entries = []
+        for name in os.listdir(model_dir):
+            entry = os.path.join(model_dir, name)
+            index_path = os.path.join(entry, 'faiss.index')
+            if entry != self.cache_dir and os.path.exists(index_path) \
+                    and os.path.exists(os.path.join(entry, 'keys.npy')):
+                entries.append((os.path.getmtime(index_path), entry))
+        if not entries:
+            return {}, np.empty((0, dimension), dtype=np.float32)
+        
+        entry = max(entries)[1]
+        keys = np.load(os.path.join(entry, 'keys.npy'))
+        embeddings = np.load(os.path.join(entry, 'emb.npy'), mmap_mode='r')
+        if embeddings.shape[1] != dimension:
+            return {}, np.empty((0, dimension), dtype=np.float32)
+        return {key.tobytes(): row for row, key in enumerate(keys)}, embeddings
+    
+    def _load_cache(self) -> bool:
+        """
+        Load documents, embeddings and FAISS index from the cache.
+        
+        Returns:
+            True if the cache was complete and loaded, False otherwise
+        """
+        docs_path = os.path.join(self.cache_dir, 'docs.pkl')
+        emb_path = os.path.join(self.cache_dir, 'emb.npy')
+        index_path = os.path.join(self.cache_dir, 'faiss.index')
+        if not all(os.path.exists(p) for p in (docs_path, emb_path, index_path)):
+            return False
+        
+        print(f"Loading cached embeddings from {self.cache_dir}...")
+        with open(docs_path, 'rb') as f:
+            self.documents = pickle.load(f)
+        # Memory-map rather than read: pages are shared through the OS cache
+        self.embeddings = np.load(emb_path, mmap_mode='r')
+        self.index = faiss.read_index(index_path)
+        return True
+    
+    def _save_cache(self):
+        """Save documents, embeddings and FAISS index for the next startup."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, 'docs.pkl'), 'wb') as f:
+            pickle.dump(self.documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Embeddings were already written in place by _create_embeddings
+        self.embeddings.flush()
+        # Index last: its presence marks the cache entry as complete
+        faiss.write_index(self.index, os.path.join(self.cache_dir, 'faiss.index'))
+    
     def _load_documents(self):
         """Load and process documents from the scraped JSON."""
         print("Loading documents from JSON...")
         
-        with open(self.json_path, 'r', encoding='utf-8') as f:
-            pages = json.load(f)
+        # The scraper gzips its output when run with --compress
+        opener = gzip.open if self.json_path.endswith('.gz') else open
+        with opener(self.json_path, 'rb') as f:
+            data = f.read()
+        pages = orjson.loads(data) if orjson else json.loads(data)
         
         self.documents = []
         
         for page in pages:
+            title = page['title']
+            url = page['url']
+            breadcrumb = ' > '.join(page['breadcrumb'])
+            
             # Process each section as a separate document
             if page['sections']:
-                for section in page['sections']:
-                    if section['content'].strip():
-                        doc = {
-                            'content': section['content'],
-                            'title': page['title'],
-                            'section_header': section['header'],
-                            'url': page['url'],
-                            'breadcrumb': ' > '.join(page['breadcrumb']),
-                            'full_context': f"Page: {page['title']}\nSection: {section['header']}\nContent: {section['content']}"
-                        }
-                        self.documents.append(doc)
-            else:
-                # If no sections, use the full page
-                if page['full_text'].strip():
-                    doc = {
-                        'content': page['full_text'],
-                        'title': page['title'],
-                        'section_header': 'Full Page',
-                        'url': page['url'],
-                        'breadcrumb': ' > '.join(page['breadcrumb']),
-                        'full_context': f"Page: {page['title']}\nContent: {page['full_text']}"
+                self.documents.extend([
+                    {
+                        'content': section['content'],
+                        'title': title,
+                        'section_header': section['header'],
+                        'url': url,
+                        'breadcrumb': breadcrumb
                     }
-                    self.documents.append(doc)
+                    for section in page['sections']
+                    if section['content'].strip()
+                ])
+            # If no sections, use the full page
+            elif page['full_text'].strip():
+                self.documents.append({
+                    'content': page['full_text'],
+                    'title': title,
+                    'section_header': 'Full Page',
+                    'url': url,
+                    'breadcrumb': breadcrumb
+                })
         
-        print(f"Processed {len(self.documents)} document sections")
+        # Keep the first occurrence of repeated boilerplate so each distinct
+        # text is embedded and indexed once
+        seen = set()
+        unique_documents = []
+        for doc in self.documents:
+            key = hashlib.blake2b(doc['content'].encode('utf-8'), digest_size=16).digest()
+            if key not in seen:
+                seen.add(key)
+                unique_documents.append(doc)
+        duplicates = len(self.documents) - len(unique_documents)
+        self.documents = unique_documents
+        
+        print(f"Processed {len(self.documents)} document sections ({duplicates} duplicates skipped)")
     
     def _create_embeddings(self):
         """Create embeddings for all documents using CPU-friendly model."""
         print("Creating embeddings (this may take a moment)...")
         
-        # Load sentence transformer model (works well on CPU)
-        self.embedding_model = SentenceTransformer(self.model_name)
-        
         # Extract text for embedding
         texts = [doc['content'] for doc in self.documents]
+        dimension = self.embedding_model.get_sentence_embedding_dimension()
         
-        # Create embeddings
-        self.embeddings = self.embedding_model.encode(texts, show_progress_bar=True)
+        # Encode straight into the cache file instead of a transient array
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.embeddings = np.lib.format.open_memmap(
+            os.path.join(self.cache_dir, 'emb.npy'),
+            mode='w+',
+            dtype=np.float32,
+            shape=(len(texts), dimension)
+        )
         
-        # Create FAISS index for fast similarity search
-        dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)  # Inner product (cosine similarity)
+        # Copy sections unchanged since the previous scrape from its cache
+        # entry, so only new or edited sections go through the encoder
+        keys = np.array(
+            [np.frombuffer(hashlib.sha256(text.encode('utf-8')).digest(), dtype=np.uint8) for text in texts],
+            dtype=np.uint8
+        ).reshape(len(texts), 32)
+        previous_rows, previous_embeddings = self._previous_embeddings(dimension)
+        missing = []
+        for row, key in enumerate(keys):
+            previous_row = previous_rows.get(key.tobytes())
+            if previous_row is None:
+                missing.append(row)
+            else:
+                self.embeddings[row] = previous_embeddings[previous_row]
+        if len(missing) < len(texts):
+            print(f"Reused {len(texts) - len(missing)} cached embeddings, encoding {len(missing)}")
         
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(self.embeddings)
-        self.index.add(self.embeddings)
+        # Create normalized embeddings (cosine similarity), in fp16 on GPU
+        autocast = torch.autocast('cuda', dtype=torch.float16) if self.device == 'cuda' else nullcontext()
+        chunk_size = EMBEDDING_BATCH_SIZE * 16
+        with autocast:
+            for start in tqdm(range(0, len(missing), chunk_size), desc="Embedding"):
+                rows = missing[start:start + chunk_size]
+                self.embeddings[rows] = self.embedding_model.encode(
+                    [texts[row] for row in rows],
+                    batch_size=EMBEDDING_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+        np.save(os.path.join(self.cache_dir, 'keys.npy'), keys)
+        
+        # Create FAISS index for fast similarity search
+        self.index = self._build_index(self.embeddings)
         
         print(f"Created {len(self.embeddings)} embeddings with dimension {dimension}")
     
+    def _build_index(self, embeddings: np.ndarray):
+        """
+        Build a FAISS inner-product index sized to the corpus.
+        
+        Small corpora use exact fp32 search, mid-sized ones an int8 scalar
+        quantizer (4x less memory), and large ones an IVF-PQ index so query
+        cost and memory grow sub-linearly with the corpus.
+        
+        Args:
+            embeddings: L2-normalized document embeddings
+            
+        Returns:
+            A populated FAISS index
+        """
+        num_vectors, dimension = embeddings.shape
+        
+        if num_vectors < SQ8_MIN_DOCUMENTS:
+            # Inner product (cosine similarity) over every vector
+            index = faiss.IndexFlatIP(dimension)
+        elif num_vectors < IVFPQ_MIN_DOCUMENTS or dimension % IVFPQ_SUBQUANTIZERS:
+            index = faiss.IndexScalarQuantizer(
+                dimension,
+                faiss.ScalarQuantizer.QT_8bit,
+                faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings)
+        else:
+            nlist = int(np.sqrt(num_vectors))
+            index = faiss.index_factory(
+                dimension,
+                f"IVF{nlist},PQ{IVFPQ_SUBQUANTIZERS}x8",
+                faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings)
+            index.nprobe = max(1, nlist // 16)
+        
+        index.add(embeddings)
+        return index
+    
     def _setup_qa_pipeline(self):
         """Setup the question-answering pipeline."""
         print("Setting up QA pipeline...")
         
-        # Use a CPU-friendly QA model
-        self.qa_pipeline = pipeline(
-            "question-answering",
-            model="distilbert-base-cased-distilled-squad",
-            tokenizer="distilbert-base-cased-distilled-squad"
-        )
+        # Use a CPU-friendly QA model (INT8 ONNX Runtime when available)
+        self.qa_pipeline = load_qa_pipeline()
+        self.tokenizer = self.qa_pipeline.tokenizer
         
         print("QA pipeline ready")
     
-    def retrieve_relevant_docs(self, query: str, top_k: int = 3) -> List[Dict]:
+    def retrieve_relevant_docs(self, query: str, top_k: int = 3) -> List[Hit]:
         """
         Retrieve the most relevant documents for a query.
         
@@ -128,26 +471,104 @@ class QuickBuildRAG:
             top_k: Number of documents to retrieve
             
         Returns:
-            List of relevant documents with scores
+            List of hits pointing into self.documents, best first
+        """
+        return self.retrieve_relevant_docs_batch([query], top_k)[0]
+    
+    def retrieve_relevant_docs_batch(self, queries: List[str], top_k: int = 3) -> List[List[Hit]]:
+        """
+        Retrieve relevant documents for several queries with one encode and one search.
+        
+        Args:
+            queries: User questions
+            top_k: Number of documents to retrieve per query
+            
+        Returns:
+            One list of hits per query, in order
+        """
+        return self._search(self._encode_queries(queries), top_k)
+    
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode queries in a single batch into normalized float32 embeddings."""
+        return self.embedding_model.encode(
+            queries,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+    
+    def _search(self, query_embeddings: np.ndarray, top_k: int) -> List[List[Hit]]:
+        """Search the index with already-encoded queries."""
+        scores, indices = self.index.search(query_embeddings, top_k)
+        
+        # Return references to relevant documents with scores
+        return [
+            [
+                Hit(int(idx), float(score), i + 1)
+                for i, (score, idx) in enumerate(zip(row_scores, row_indices))
+                # IVF indexes pad with -1 when fewer than top_k hits are found
+                if idx >= 0
+            ]
+            for row_scores, row_indices in zip(scores, indices)
+        ]
+    
+    def _build_context(self, query: str, context_docs: List[Hit]) -> str:
         """
-        # Encode the query
-        query_embedding = self.embedding_model.encode([query])
-        faiss.normalize_L2(query_embedding)
+        Combine top documents into a context that fits one model window.
         
-        # Search for similar documents
-        scores, indices = self.index.search(query_embedding, top_k)
+        Sections are added in rank order and the last one is cut on a token
+        boundary, so the QA model sees whole tokens and no overflow windows.
         
-        # Return relevant documents with scores
-        results = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            doc = self.documents[idx].copy()
-            doc['relevance_score'] = float(score)
-            doc['rank'] = i + 1
-            results.append(doc)
+        Args:
+            query: User's question
+            context_docs: Retrieved relevant documents
+            
+        Returns:
+            Context string for the QA model
+        """
+        question_tokens = len(self.tokenizer(query, add_special_tokens=False)['input_ids'])
+        budget = QA_MAX_SEQ_LEN - question_tokens - 3
+        
+        parts = []
+        for hit in context_docs:
+            doc = self.documents[hit.doc_idx]
+            part = f"Section: {doc['section_header']}\n{doc['content']}"
+            offsets = self.tokenizer(
+                part, add_special_tokens=False, return_offsets_mapping=True
+            )['offset_mapping']
+            if len(offsets) > budget:
+                if budget > 0:
+                    parts.append(part[:offsets[budget - 1][1]])
+                break
+            parts.append(part)
+            # Blank line between sections costs no tokens
+            budget -= len(offsets)
         
-        return results
+        return "\n\n".join(parts)
     
-    def generate_answer(self, query: str, context_docs: List[Dict]) -> Dict:
+    def _sources(self, context_docs: List[Hit]) -> List[Dict]:
+        """Describe retrieved documents as answer sources."""
+        sources = []
+        for hit in context_docs:
+            doc = self.documents[hit.doc_idx]
+            sources.append({
+                'title': doc['title'],
+                'section': doc['section_header'],
+                'url': doc['url'],
+                'relevance': hit.score
+            })
+        return sources
+    
+    def _format_answer(self, result: Dict, context_docs: List[Hit], combined_context: str) -> Dict:
+        """Shape a QA pipeline result into the answer dictionary returned by ask()."""
+        return {
+            'answer': result['answer'],
+            'confidence': result['score'],
+            'sources': self._sources(context_docs),
+            'context_used': combined_context[:500] + "..." if len(combined_context) > 500 else combined_context
+        }
+    
+    def generate_answer(self, query: str, context_docs: List[Hit]) -> Dict:
         """
         Generate an answer using the QA pipeline and retrieved documents.
         
@@ -158,48 +579,23 @@ class QuickBuildRAG:
         Returns:
             Dictionary with answer and metadata
         """
-        # Combine contexts from top documents
-        combined_context = "\n\n".join([
-            f"Section: {doc['section_header']}\n{doc['content']}"
-            for doc in context_docs
-        ])
-        
-        # Limit context length for the model
-        max_context_length = 2000
-        if len(combined_context) > max_context_length:
-            combined_context = combined_context[:max_context_length] + "..."
+        combined_context = self._build_context(query, context_docs)
         
         try:
             # Use QA pipeline to generate answer
-            result = self.qa_pipeline(question=query, context=combined_context)
+            result = self.qa_pipeline(
+                question=query,
+                context=combined_context,
+                max_seq_len=QA_MAX_SEQ_LEN,
+                doc_stride=QA_DOC_STRIDE
+            )
             
-            return {
-                'answer': result['answer'],
-                'confidence': result['score'],
-                'sources': [
-                    {
-                        'title': doc['title'],
-                        'section': doc['section_header'],
-                        'url': doc['url'],
-                        'relevance': doc['relevance_score']
-                    }
-                    for doc in context_docs
-                ],
-                'context_used': combined_context[:500] + "..." if len(combined_context) > 500 else combined_context
-            }
+            return self._format_answer(result, context_docs, combined_context)
         except Exception as e:
             return {
-                'answer': f"I couldn't generate a specific answer, but here's what I found in the documentation: {context_docs[0]['content'][:300]}...",
+                'answer': f"I couldn't generate a specific answer, but here's what I found in the documentation: {self.documents[context_docs[0].doc_idx]['content'][:300]}...",
                 'confidence': 0.5,
-                'sources': [
-                    {
-                        'title': doc['title'],
-                        'section': doc['section_header'],
-                        'url': doc['url'],
-                        'relevance': doc['relevance_score']
-                    }
-                    for doc in context_docs
-                ],
+                'sources': self._sources(context_docs),
                 'error': str(e)
             }
     
@@ -217,8 +613,21 @@ class QuickBuildRAG:
         print(f"\nQuestion: {question}")
         print("-" * 50)
         
+        # Repeated question: skip encoding, retrieval and QA entirely
+        key = (question.strip().lower(), top_k)
+        cached = self._answer_cache.get(key)
+        if cached is not None:
+            self._answer_cache.move_to_end(key)
+            return cached
+        
+        # Near-duplicate question: reuse the answer, skip retrieval and QA
+        query_embedding = self._encode_queries([question])
+        cached = self._semantic_lookup(query_embedding[0], top_k)
+        if cached is not None:
+            return cached
+        
         # Step 1: Retrieve relevant documents
-        relevant_docs = self.retrieve_relevant_docs(question, top_k)
+        relevant_docs = self._search(query_embedding, top_k)[0]
         
         if not relevant_docs:
             return {
@@ -230,8 +639,84 @@ class QuickBuildRAG:
         # Step 2: Generate answer
         result = self.generate_answer(question, relevant_docs)
         
+        if 'error' not in result:
+            self._remember_answer(key, query_embedding[0], result)
+        
         return result
     
+    def _semantic_lookup(self, query_embedding: np.ndarray, top_k: int):
+        """Return a cached answer whose question embedding is close enough, or None."""
+        count = len(self._semantic_results)
+        if not count:
+            return None
+        
+        similarities = self._semantic_embeddings[:count] @ query_embedding
+        similarities[self._semantic_top_k[:count] != top_k] = -1.0
+        best = int(np.argmax(similarities))
+        if similarities[best] < SEMANTIC_CACHE_THRESHOLD:
+            return None
+        return self._semantic_results[best]
+    
+    def _remember_answer(self, key: Tuple[str, int], query_embedding: np.ndarray, result: Dict):
+        """Add an answer to both caches, evicting the oldest entries when full."""
+        self._answer_cache[key] = result
+        if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+            self._answer_cache.popitem(last=False)
+        
+        if self._semantic_embeddings is None:
+            self._semantic_embeddings = np.zeros(
+                (ANSWER_CACHE_SIZE, query_embedding.shape[0]), dtype=np.float32
+            )
+        
+        # Ring buffer: overwrite the oldest row once the cache is full
+        slot = self._semantic_next
+        self._semantic_embeddings[slot] = query_embedding
+        self._semantic_top_k[slot] = key[1]
+        if slot < len(self._semantic_results):
+            self._semantic_results[slot] = result
+        else:
+            self._semantic_results.append(result)
+        self._semantic_next = (slot + 1) % ANSWER_CACHE_SIZE
+    
+    def ask_batch(self, questions: List[str], top_k: int = 3) -> List[Dict]:
+        """
+        Answer several questions with a single batched QA model call.
+        
+        Args:
+            questions: The questions to ask
+            top_k: Number of relevant documents to consider per question
+            
+        Returns:
+            One answer dictionary per question, in order
+        """
+        if not questions:
+            return []
+        
+        docs_per_question = self.retrieve_relevant_docs_batch(questions, top_k)
+        contexts = [
+            self._build_context(q, docs)
+            for q, docs in zip(questions, docs_per_question)
+        ]
+        
+        try:
+            results = self.qa_pipeline(
+                [{'question': q, 'context': c} for q, c in zip(questions, contexts)],
+                batch_size=len(questions),
+                max_seq_len=QA_MAX_SEQ_LEN,
+                doc_stride=QA_DOC_STRIDE
+            )
+        except Exception:
+            # Fall back to one call per question so a bad input only fails itself
+            return [self.ask(q, top_k) for q in questions]
+        
+        if isinstance(results, dict):
+            results = [results]
+        
+        return [
+            self._format_answer(result, docs, context)
+            for result, docs, context in zip(results, docs_per_question, contexts)
+        ]
+    
     def interactive_mode(self):
         """Run in interactive mode for continuous questions."""
         print("\n" + "="*60)
@@ -240,13 +725,6 @@ class QuickBuildRAG:
         print("Type 'exit' to quit, 'help' for examples.")
         print("="*60)
         
-        example_questions = [
-            "How do I add a step to an existing configuration?",
-            "What are the different types of build triggers?",
-            "How do I set up email notifications?",
-            "What is the difference between build configurations and build steps?"
-        ]
-        
         while True:
             try:
                 question = input("\n🤖 Ask me about QuickBuild: ").strip()
@@ -257,7 +735,7 @@ class QuickBuildRAG:
                 
                 if question.lower() == 'help':
                     print("\nExample questions you can ask:")
-                    for i, q in enumerate(example_questions, 1):
+                    for i, q in enumerate(EXAMPLE_QUESTIONS, 1):
                         print(f"{i}. {q}")
                     continue
                 
@@ -1,360 +1,943 @@
-#!/usr/bin/env python3
-
-import requests
-from bs4 import BeautifulSoup
-import json
-import os
-import re
-import time
-import argparse
-import sys
-from urllib.parse import urljoin, urlparse, urldefrag
-from tqdm import tqdm
-
-# --- Configuration ---
-BASE_URL = "https://wiki.pmease.com/display/QB14/"
-OUTPUT_DIR = "scraper/output"
-
-class QuickBuildScraper:
-    def __init__(self, base_url=BASE_URL, output_dir=OUTPUT_DIR):
-        """
-        Initialize the QuickBuild documentation scraper.
-        
-        Args:
-            base_url: The base URL of the QuickBuild documentation wiki.
-            output_dir: Directory to save the scraped content.
-        """
-        self.base_url = base_url
-        self.output_dir = output_dir
-        self.visited_urls = set()
-        self.session = requests.Session()
-        
-        # Create output directory structure
-        os.makedirs(output_dir, exist_ok=True)
-        os.makedirs(f"{output_dir}/json", exist_ok=True)
-        os.makedirs(f"{output_dir}/text", exist_ok=True)
-        
-        # Headers to mimic a browser request
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-    
-    def is_valid_url(self, url):
-        """
-        Check if a URL is valid and belongs to the QB14 documentation ONLY.
-        
-        Args:
-            url: The URL to check.
-            
-        Returns:
-            bool: True if the URL is valid, False otherwise.
-        """
-        # Make sure it's a full URL
-        if not url.startswith('http'):
-            return False
-        
-        # Make sure it's from the same domain
-        parsed_base = urlparse(self.base_url)
-        parsed_url = urlparse(url)
-        if parsed_base.netloc != parsed_url.netloc:
-            return False
-        
-        # CRITICAL: Only allow QB14 URLs - reject other versions
-        if not url.startswith("https://wiki.pmease.com/display/QB14/"):
-            return False
-        
-        # Avoid non-documentation pages
-        excluded_paths = [
-            '/login', '/logout', '/register', '/preferences',
-            '/attachment/', '/history/', '/info/', '/compare/',
-        ]
-        for path in excluded_paths:
-            if path in url:
-                return False
-        
-        # Avoid URLs with anchors
-        if '#' in url:
-            return False
-        
-        return True
-    
-    def clean_text(self, text):
-        """
-        Clean extracted text.
-        
-        Args:
-            text: The text to clean.
-            
-        Returns:
-            str: Cleaned text.
-        """
-        # Remove extra whitespace and normalize line breaks
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-    
-    def extract_content(self, soup, url):
-        """
-        Extract content from a BeautifulSoup object.
-        
-        Args:
-            soup: BeautifulSoup object of the page.
-            url: The URL of the page.
-            
-        Returns:
-            dict: Extracted content.
-        """
-        # Extract title
-        title_elem = soup.find('h1')
-        title = title_elem.get_text().strip() if title_elem else "Unknown Title"
-        
-        # Try multiple content selectors for different page layouts
-        content_elem = (soup.find('article') or 
-                       soup.find(class_='wiki-content') or 
-                       soup.find(id='main-content'))
-        
-        if not content_elem:
-            content_text = "No content found."
-            sections = []
-        else:
-            # Extract all text from content area
-            content_text = content_elem.get_text(separator='\n', strip=True)
-            
-            # Extract sections with headers and content
-            sections = []
-            headers = content_elem.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-            
-            for header in headers:
-                header_text = header.get_text().strip()
-                section_content = []
-                
-                # Get all content until the next header
-                sibling = header.next_sibling
-                while sibling and not (sibling.name and sibling.name.startswith('h')):
-                    if hasattr(sibling, 'get_text'):
-                        text = sibling.get_text(strip=True)
-                        if text:
-                            section_content.append(text)
-                    sibling = sibling.next_sibling
-                
-                sections.append({
-                    'header': header_text,
-                    'content': ' '.join(section_content)
-                })
-        
-        # Extract links for recursive scraping
-        links = []
-        for a_tag in soup.find_all('a', href=True):
-            link_url = urljoin(url, a_tag['href'])
-            # Normalize URL by removing fragments
-            link_url = urldefrag(link_url).url
-            if self.is_valid_url(link_url) and link_url not in self.visited_urls:
-                links.append(link_url)
-        
-        # Extract breadcrumb for context
-        breadcrumb_elem = soup.find(class_='breadcrumbs') or soup.find(class_='breadcrumb')
-        breadcrumb = []
-        
-        if breadcrumb_elem:
-            for crumb in breadcrumb_elem.find_all('a'):
-                breadcrumb.append(crumb.get_text().strip())
-        
-        # Create structured content
-        structured_content = {
-            'url': url,
-            'title': title,
-            'breadcrumb': breadcrumb,
-            'full_text': content_text,
-            'sections': sections,
-            'links': links
-        }
-        
-        return structured_content
-    
-    def scrape_page(self, url):
-        """
-        Scrape a single page.
-        
-        Args:
-            url: The URL of the page to scrape.
-            
-        Returns:
-            dict: Scraped content, or None if the page couldn't be scraped.
-        """
-        # Normalize the URL by removing any #fragments
-        url = urldefrag(url).url
-        
-        # Skip if already visited
-        if url in self.visited_urls:
-            return None
-        
-        self.visited_urls.add(url)
-        
-        try:
-            # Make the request with a small delay to be polite
-            time.sleep(1)
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract content
-            content = self.extract_content(soup, url)
-            
-            # Save the content
-            self.save_content(content)
-            
-            return content
-        except Exception as e:
-            print(f"  -> ERROR scraping {url}: {str(e)}")
-            return None
-    
-    def save_content(self, content):
-        """
-        Save content to JSON and text files.
-        
-        Args:
-            content: The content to save.
-        """
-        if not content:
-            return
-        
-        # Generate a filename from the URL
-        parsed_url = urlparse(content['url'])
-        filename = parsed_url.path.strip('/').replace('/', '_')
-        if not filename or filename == 'display_QB14':
-            filename = 'index'
-        
-        # Save as JSON
-        json_path = f"{self.output_dir}/json/{filename}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
-        
-        # Save as text
-        text_path = f"{self.output_dir}/text/{filename}.txt"
-        with open(text_path, 'w', encoding='utf-8') as f:
-            f.write(f"Title: {content['title']}\n")
-            f.write(f"URL: {content['url']}\n")
-            f.write(f"Breadcrumb: {' > '.join(content['breadcrumb'])}\n\n")
-            f.write(content['full_text'])
-    
-    def recursive_scrape(self, start_url, max_pages=None):
-        """
-        Recursively scrape pages starting from a URL.
-        
-        Args:
-            start_url: The URL to start scraping from.
-            max_pages: Maximum number of pages to scrape (None for no limit).
-            
-        Returns:
-            list: List of all scraped content.
-        """
-        to_visit = [start_url]
-        scraped_content = []
-        visited_count = 0
-        
-        with tqdm(total=1, desc="Scraping pages") as progress_bar:
-            while to_visit and (max_pages is None or visited_count < max_pages):
-                current_url = to_visit.pop(0)
-                
-                if current_url in self.visited_urls:
-                    continue
-                
-                print(f"Scraping: {current_url}")
-                content = self.scrape_page(current_url)
-                
-                if content:
-                    scraped_content.append(content)
-                    visited_count += 1
-                    
-                    # Add new links to visit
-                    for link in content['links']:
-                        if link not in self.visited_urls and link not in to_visit:
-                            to_visit.append(link)
-                
-                progress_bar.update(1)
-                progress_bar.total = len(to_visit) + visited_count
-                progress_bar.refresh()
-        
-        print(f"Scraped {visited_count} pages.")
-        return scraped_content
-    
-    def create_combined_output(self):
-        """
-        Create combined output files with all content.
-        """
-        # Combined JSON
-        all_content = []
-        json_dir = f"{self.output_dir}/json"
-        
-        if os.path.exists(json_dir):
-            for filename in os.listdir(json_dir):
-                if filename.endswith('.json'):
-                    try:
-                        with open(os.path.join(json_dir, filename), 'r', encoding='utf-8') as f:
-                            all_content.append(json.load(f))
-                    except Exception as e:
-                        print(f"Error reading {filename}: {e}")
-        
-        # Save combined JSON
-        with open(f"{self.output_dir}/all_content.json", 'w', encoding='utf-8') as f:
-            json.dump(all_content, f, indent=2, ensure_ascii=False)
-        
-        # Save combined text
-        with open(f"{self.output_dir}/all_content.txt", 'w', encoding='utf-8') as f:
-            for content in all_content:
-                f.write(f"Title: {content['title']}\n")
-                f.write(f"URL: {content['url']}\n")
-                f.write(f"Breadcrumb: {' > '.join(content['breadcrumb'])}\n\n")
-                f.write(content['full_text'])
-                f.write("\n\n" + "="*80 + "\n\n")
-        
-        print(f"Created combined output files in {self.output_dir}/")
-        print(f"  - all_content.json ({len(all_content)} pages)")
-        print(f"  - all_content.txt")
-
-
-def main():
-    """Main execution function with error handling."""
-    
-    # Set up argument parser
-    parser = argparse.ArgumentParser(description='Scrape QuickBuild documentation wiki.')
-    parser.add_argument('--url', default=BASE_URL,
-                        help='Starting URL for scraping.')
-    parser.add_argument('--output', default=OUTPUT_DIR,
-                        help='Output directory for scraped content.')
-    parser.add_argument('--single', action='store_true', 
-                        help='Scrape only a single page (for testing).')
-    parser.add_argument('--max_pages', type=int, default=None,
-                        help='Maximum number of pages to scrape.')
-    
-    args = parser.parse_args()
-    
-    try:
-        # Initialize scraper
-        scraper = QuickBuildScraper(base_url=args.url, output_dir=args.output)
-        
-        # Scrape
-        if args.single:
-            print(f"Scraping single page: {args.url}")
-            scraper.scrape_page(args.url)
-        else:
-            print(f"Recursively scraping from: {args.url}")
-            scraper.recursive_scrape(args.url, args.max_pages)
-            scraper.create_combined_output()
-        
-        print(f"Scraping complete. Content saved to {args.output}/")
-        
-    except Exception as e:
-        print("--- SCRIPT FAILED WITH AN ERROR ---")
-        exc_type, exc_obj, exc_tb = sys.exc_info()
-        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
-        print(f"ERROR TYPE: {exc_type}\nIN FILE: {fname}\nAT LINE: {exc_tb.tb_lineno}\nDETAILS: {e}")
-        print("-----------------------------------")
-        sys.exit(1)
-
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
+import gzip
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+import argparse
+import sys
+from email.utils import parsedate_to_datetime
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlparse, urldefrag, urlsplit, urlunsplit, parse_qsl, urlencode
+from tqdm import tqdm
+
+try:
+    import orjson  # Optional: faster JSON serialization of scraped pages
+except ImportError:
+    orjson = None
+
+# --- Configuration ---
+BASE_URL = "https://wiki.pmease.com/display/QB14/"
+OUTPUT_DIR = "scraper/output"
+WORKERS = 8
+WRITE_BUFFER_SIZE = 1 << 20
+COMPRESS_LEVEL = 3  # Fast gzip level; output is still several times smaller
+WRITE_QUEUE_SIZE = 256
+CHECKPOINT_INTERVAL = 50
+REQUESTS_PER_SECOND = 4.0
+
+# Responses telling us to slow down, and how far the rate limiter may back off
+THROTTLE_STATUSES = (429, 503)
+THROTTLE_RETRIES = 3
+MAX_REQUEST_INTERVAL = 30.0
+
+# Precompiled XPath queries used by extract_content
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+WIKI_CONTENT_XPATH = etree.XPath(f"(//*[{_has_class('wiki-content')}])[1]")
+# Links of the first .breadcrumbs element, or of the first .breadcrumb one if there is none
+BREADCRUMB_LINKS_XPATH = etree.XPath(
+    f"(//*[{_has_class('breadcrumbs')}])[1]//a"
+    f" | (//*[{_has_class('breadcrumb')}])[1][not(//*[{_has_class('breadcrumbs')}])]//a"
+)
+VISIBLE_TEXT_XPATH = etree.XPath('descendant-or-self::text()[not(parent::script or parent::style)]')
+LINK_HREF_XPATH = etree.XPath('//body//a/@href')
+
+HEADER_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+HIDDEN_TAGS = frozenset(('script', 'style'))
+
+# Links that can never lead to a documentation page, skipped before URL parsing
+SKIPPED_HREF_PREFIXES = ('#', 'mailto:', 'javascript:', 'tel:')
+SKIPPED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.pdf', '.zip')
+
+# Wiki paths that never hold documentation
+EXCLUDED_PATHS = (
+    '/login', '/logout', '/register', '/preferences',
+    '/attachment/', '/history/', '/info/', '/compare/',
+)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Text of pages without a recognised content area
+NO_CONTENT_TEXT = "No content found."
+
+# Query parameters that never change the page served, dropped when comparing URLs
+NOISY_QUERY_PARAMS = frozenset(('sessionid', 'jsessionid'))
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+@lru_cache(maxsize=1 << 15)
+def canonicalize(url):
+    """
+    Reduce a URL to a canonical form used to recognise already seen pages.
+    
+    Lowercases the scheme and host, drops default ports, session ids,
+    tracking parameters, fragments and trailing slashes, and sorts the query.
+    
+    Args:
+        url: The URL to canonicalize.
+        
+    Returns:
+        str: The canonical URL.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[:-len(default_port)]
+    
+    path = parts.path.split(';jsessionid=')[0].rstrip('/') or '/'
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in NOISY_QUERY_PARAMS and not key.lower().startswith('utm_')
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def content_digest(content):
+    """
+    Hash the title and text of a page, to recognise the same page under another URL.
+    
+    Args:
+        content: The extracted content of the page.
+        
+    Returns:
+        bytes: A 16-byte blake2b digest.
+    """
+    page_text = f"{content['title']}\n{content['full_text']}"
+    return hashlib.blake2b(page_text.encode('utf-8'), digest_size=16).digest()
+
+def dump_json(content, indent=False):
+    """
+    Serialize content to UTF-8 encoded JSON, using orjson when installed.
+    
+    Args:
+        content: The object to serialize.
+        indent: Whether to pretty-print with two-space indentation.
+        
+    Returns:
+        bytes: The encoded JSON document.
+    """
+    if orjson:
+        return orjson.dumps(content, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(content, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def retry_after_seconds(response):
+    """
+    Read the Retry-After header of a response.
+    
+    Args:
+        response: The HTTP response.
+        
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    
+    # Either a number of seconds or an HTTP date
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def format_text(content):
+    """
+    Render a page as the plain-text document saved to the text outputs.
+    
+    Args:
+        content: The extracted content of the page.
+        
+    Returns:
+        str: Title, URL and breadcrumb header followed by the page text.
+    """
+    return (f"Title: {content['title']}\n"
+            f"URL: {content['url']}\n"
+            f"Breadcrumb: {' > '.join(content['breadcrumb'])}\n\n"
+            f"{content['full_text']}")
+
+class RateLimiter:
+    def __init__(self, rate):
+        """
+        Space out requests across all worker threads, slowing down when the
+        server asks us to.
+        
+        Args:
+            rate: Maximum number of requests per second for the whole crawl.
+        """
+        self.min_interval = 1.0 / rate
+        self.interval = self.min_interval
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        """
+        Block until the calling thread may send its next request.
+        """
+        # Reserve the next free slot under the lock, but sleep outside it
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def backoff(self, delay=None):
+        """
+        Halve the request rate and pause all workers after a throttling response.
+        
+        Args:
+            delay: Seconds requested by the server's Retry-After header, if any.
+        """
+        with self.lock:
+            self.interval = min(self.interval * 2, MAX_REQUEST_INTERVAL)
+            pause = self.interval if delay is None else delay
+            self.next_slot = max(self.next_slot, time.monotonic() + pause)
+    
+    def recover(self):
+        """
+        Move the request rate back towards its maximum after a successful request.
+        """
+        with self.lock:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+class QuickBuildScraper:
+    def __init__(self, base_url=BASE_URL, output_dir=OUTPUT_DIR, workers=WORKERS,
+                 rate=REQUESTS_PER_SECOND, compress=False):
+        """
+        Initialize the QuickBuild documentation scraper.
+        
+        Args:
+            base_url: The base URL of the QuickBuild documentation wiki.
+            output_dir: Directory to save the scraped content.
+            workers: Number of pages to fetch concurrently.
+            rate: Maximum number of requests per second across all workers.
+            compress: Whether to gzip the per-page and combined output files.
+        """
+        self.base_url = base_url
+        self.base_netloc = urlparse(base_url).netloc
+        self.output_dir = output_dir
+        self.workers = workers
+        self.compress = compress
+        self.rate_limiter = RateLimiter(rate)
+        self.visited_urls = set()  # Canonical URLs, see canonicalize()
+        self.content_hashes = set()
+        
+        # Crawl checkpoint, removed once a crawl completes
+        self.visited_log_path = f"{output_dir}/visited.log"
+        self.frontier_path = f"{output_dir}/frontier.json"
+        self.pages_path = f"{output_dir}/pages.jsonl.gz"
+        self.text_path = self.output_path(f"{output_dir}/all_content.txt")
+        
+        # Create output directory structure
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(f"{output_dir}/json", exist_ok=True)
+        os.makedirs(f"{output_dir}/text", exist_ok=True)
+        
+        # Headers to mimic a browser request
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+        }
+        
+        # Set the headers once so every request on the session reuses them
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
+        # Keep one pooled keep-alive connection per worker and retry transient
+        # failures; throttling responses are left to the rate limiter
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=workers,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=(500, 502, 504))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def is_valid_url(self, url):
+        """
+        Check if a URL is valid and belongs to the QB14 documentation ONLY.
+        
+        Args:
+            url: The URL to check.
+            
+        Returns:
+            bool: True if the URL is valid, False otherwise.
+        """
+        # Make sure it's a full URL
+        if not url.startswith('http'):
+            return False
+        
+        # CRITICAL: Only allow QB14 URLs - reject other versions
+        # (a cheap prefix check, so off-site links never reach urlparse)
+        if not url.startswith("https://wiki.pmease.com/display/QB14/"):
+            return False
+        
+        # Make sure it's from the same domain
+        if urlparse(url).netloc != self.base_netloc:
+            return False
+        
+        # Avoid non-documentation pages
+        if any(path in url for path in EXCLUDED_PATHS):
+            return False
+        
+        # Avoid URLs with anchors
+        if '#' in url:
+            return False
+        
+        return True
+    
+    def clean_text(self, text):
+        """
+        Clean extracted text.
+        
+        Args:
+            text: The text to clean.
+            
+        Returns:
+            str: Cleaned text.
+        """
+        # Remove extra whitespace and normalize line breaks
+        text = WHITESPACE_RE.sub(' ', text).strip()
+        return text
+    
+    def parse_html(self, response):
+        """
+        Parse a response body into an lxml HTML tree.
+        
+        Args:
+            response: The HTTP response of the page.
+            
+        Returns:
+            lxml.html.HtmlElement: Root element of the page.
+        """
+        # Honour an explicit charset header, otherwise assume UTF-8 as the wiki serves
+        encoding = 'utf-8'
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            encoding = response.encoding
+        
+        # Parsers are not thread-safe, so each fetch gets its own
+        parser = lxml.html.HTMLParser(encoding=encoding)
+        return lxml.html.document_fromstring(response.content, parser=parser)
+    
+    def extract_content(self, tree, url):
+        """
+        Extract content from a parsed HTML tree.
+        
+        Args:
+            tree: lxml root element of the page.
+            url: The URL of the page.
+            
+        Returns:
+            dict: Extracted content.
+        """
+        # Extract title
+        title_elem = tree.find('.//h1')
+        title = title_elem.text_content().strip() if title_elem is not None else "Unknown Title"
+        
+        # Try multiple content selectors for different page layouts
+        content_elem = tree.find('.//article')
+        if content_elem is None:
+            content_elem = next(iter(WIKI_CONTENT_XPATH(tree)), None)
+        if content_elem is None:
+            content_elem = tree.get_element_by_id('main-content', None)
+        
+        if content_elem is None:
+            content_text = NO_CONTENT_TEXT
+            sections = []
+        else:
+            # Extract the full text and the sections in a single pass over the
+            # tree, giving every text node to the most recent header
+            text_nodes = []
+            sections = []
+            section_content = None
+            walker = etree.iterwalk(content_elem, events=('start', 'end', 'comment'))
+            
+            for event, elem in walker:
+                if event == 'start':
+                    if elem.tag in HEADER_TAGS:
+                        text_nodes.extend(
+                            text.strip() for text in VISIBLE_TEXT_XPATH(elem) if text.strip()
+                        )
+                        section_content = []
+                        sections.append({
+                            'header': elem.text_content().strip(),
+                            'content': section_content
+                        })
+                        walker.skip_subtree()
+                        continue
+                    if elem.tag in HIDDEN_TAGS:
+                        walker.skip_subtree()
+                        continue
+                    text = elem.text
+                elif elem is not content_elem:
+                    # Text after a tag or comment is its tail
+                    text = elem.tail
+                else:
+                    continue
+                
+                if text and text.strip():
+                    text_nodes.append(text.strip())
+                    if section_content is not None:
+                        section_content.append(text_nodes[-1])
+            
+            content_text = '\n'.join(text_nodes)
+            for section in sections:
+                section['content'] = ' '.join(section['content'])
+        
+        # Extract links for recursive scraping
+        links = []
+        for href in LINK_HREF_XPATH(tree):
+            if href.startswith(SKIPPED_HREF_PREFIXES):
+                continue
+            
+            # Normalize URL by removing fragments, resolving only relative links
+            href = href.partition('#')[0]
+            link_url = href if href.startswith(('http://', 'https://')) else urljoin(url, href)
+            if link_url.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+            
+            if self.is_valid_url(link_url) and canonicalize(link_url) not in self.visited_urls:
+                links.append(link_url)
+        
+        # Extract breadcrumb for context
+        breadcrumb = [crumb.text_content().strip() for crumb in BREADCRUMB_LINKS_XPATH(tree)]
+        
+        # Create structured content
+        structured_content = {
+            'url': url,
+            'title': title,
+            'breadcrumb': breadcrumb,
+            'full_text': content_text,
+            'sections': sections,
+            'links': links
+        }
+        
+        return structured_content
+    
+    def is_duplicate(self, content):
+        """
+        Check whether a page with the same title and text was already scraped.
+        
+        Wikis often serve the same page under several URLs (redirects, aliases),
+        so this records the digest of every page it is given. Pages without a
+        content area all share the same placeholder text, so they are never
+        treated as duplicates.
+        
+        Args:
+            content: The extracted content of the page.
+            
+        Returns:
+            bool: True if the same content was seen before, False otherwise.
+        """
+        if content['full_text'] == NO_CONTENT_TEXT:
+            return False
+        
+        digest = content_digest(content)
+        if digest in self.content_hashes:
+            return True
+        
+        self.content_hashes.add(digest)
+        return False
+    
+    def scrape_page(self, url):
+        """
+        Scrape a single page.
+        
+        Args:
+            url: The URL of the page to scrape.
+            
+        Returns:
+            dict: Scraped content, or None if the page couldn't be scraped.
+        """
+        # Normalize the URL by removing any #fragments
+        url = urldefrag(url).url
+        
+        # Skip if already visited
+        key = canonicalize(url)
+        if key in self.visited_urls:
+            return None
+        
+        self.visited_urls.add(key)
+        
+        content = self.fetch_page(url)
+        if content and self.is_duplicate(content):
+            return None
+        
+        self.save_content(content)
+        
+        return content
+    
+    def fetch_page(self, url):
+        """
+        Fetch and extract a page without checking visited URLs or saving it.
+        
+        Args:
+            url: The normalized URL of the page to scrape.
+            
+        Returns:
+            dict: Scraped content, or None if the page couldn't be scraped.
+        """
+        try:
+            # Stay under the global request rate to be polite, backing off
+            # for every worker when the wiki says we are going too fast
+            for _ in range(THROTTLE_RETRIES + 1):
+                self.rate_limiter.wait()
+                response = self.session.get(url, timeout=10)
+                if response.status_code not in THROTTLE_STATUSES:
+                    break
+                self.rate_limiter.backoff(retry_after_seconds(response))
+            response.raise_for_status()
+            self.rate_limiter.recover()
+            
+            # Parse the HTML
+            tree = self.parse_html(response)
+            
+            # Extract content
+            return self.extract_content(tree, url)
+        except Exception as e:
+            print(f"  -> ERROR scraping {url}: {str(e)}")
+            return None
+    
+    def output_path(self, path):
+        """
+        Get the path an output file is written to.
+        
+        Args:
+            path: Path of the file, without the .gz suffix.
+            
+        Returns:
+            str: The path, with .gz appended when compressing.
+        """
+        return f"{path}.gz" if self.compress else path
+    
+    def open_output(self, path, mode, buffering=-1):
+        """
+        Open an output file for binary writing, gzip-compressed if requested.
+        
+        Args:
+            path: Path of the file, without the .gz suffix.
+            mode: 'wb' to overwrite or 'ab' to append.
+            buffering: Buffer size for uncompressed files.
+            
+        Returns:
+            file: The opened file.
+        """
+        if self.compress:
+            return gzip.open(self.output_path(path), mode, compresslevel=COMPRESS_LEVEL)
+        return open(path, mode, buffering=buffering)
+    
+    def save_content(self, content):
+        """
+        Save content to JSON and text files.
+        
+        Args:
+            content: The content to save.
+        """
+        if not content:
+            return
+        
+        # Generate a filename from the URL
+        parsed_url = urlparse(content['url'])
+        filename = parsed_url.path.strip('/').replace('/', '_')
+        if not filename or filename == 'display_QB14':
+            filename = 'index'
+        
+        # Save as JSON and text, each encoded up front and written in one call
+        json_path = f"{self.output_dir}/json/{filename}.json"
+        with self.open_output(json_path, 'wb') as f:
+            f.write(dump_json(content, indent=True))
+        
+        text_path = f"{self.output_dir}/text/{filename}.txt"
+        with self.open_output(text_path, 'wb') as f:
+            f.write(format_text(content).encode('utf-8'))
+    
+    def open_streams(self, mode):
+        """
+        Open the files every scraped page is appended to.
+        
+        Args:
+            mode: 'wb' to overwrite or 'ab' to append.
+            
+        Returns:
+            tuple: The pages.jsonl.gz and all_content.txt files.
+        """
+        pages_file = gzip.open(self.pages_path, mode, compresslevel=COMPRESS_LEVEL)
+        try:
+            text_file = self.open_output(f"{self.output_dir}/all_content.txt", mode,
+                                         buffering=WRITE_BUFFER_SIZE)
+        except Exception:
+            pages_file.close()
+            raise
+        return pages_file, text_file
+    
+    def write_pages(self, write_queue, append=False):
+        """
+        Save queued pages until a None sentinel arrives.
+        
+        Runs on a background thread so disk writes overlap with fetching.
+        Besides the per-page files, every page is appended as it arrives to
+        pages.jsonl.gz and all_content.txt, so the combined output never has
+        to re-read the per-page files. A threading.Event in the queue asks for
+        everything before it to be written out in full (see sync_outputs).
+        If the output files cannot be written, the error is kept in
+        self.writer_error and the queue is still drained so the crawl never
+        blocks on it.
+        
+        Args:
+            write_queue: Queue of content dicts and events, terminated by None.
+            append: Whether to add to the files of a resumed crawl instead of
+                overwriting them.
+        """
+        stopped = False
+        try:
+            pages_file, text_file = self.open_streams('ab' if append else 'wb')
+            try:
+                while True:
+                    content = write_queue.get()
+                    if content is None:
+                        stopped = True
+                        break
+                    
+                    if isinstance(content, threading.Event):
+                        # Closing ends the current gzip members, so the files on
+                        # disk stay readable even if the process is killed later
+                        try:
+                            pages_file.close()
+                            text_file.close()
+                            pages_file, text_file = self.open_streams('ab')
+                        except Exception as e:
+                            self.writer_error = e
+                            raise
+                        finally:
+                            # Always release sync_outputs, which checks writer_error
+                            content.set()
+                        continue
+                    
+                    try:
+                        self.save_content(content)
+                        pages_file.write(dump_json(content) + b'\n')
+                        text_file.write(f"{format_text(content)}\n\n{'=' * 80}\n\n".encode('utf-8'))
+                    except Exception as e:
+                        print(f"  -> ERROR saving {content['url']}: {str(e)}")
+            finally:
+                pages_file.close()
+                text_file.close()
+        except Exception as e:
+            self.writer_error = e
+            # Keep consuming so producers blocked on the bounded queue are released
+            while not stopped:
+                content = write_queue.get()
+                if isinstance(content, threading.Event):
+                    content.set()
+                stopped = content is None
+    
+    def sync_outputs(self, write_queue, visited_log):
+        """
+        Wait until every queued page is on disk, then flush the visited log.
+        
+        Args:
+            write_queue: Queue consumed by write_pages.
+            visited_log: The open visited.log file.
+        """
+        synced = threading.Event()
+        write_queue.put(synced)
+        synced.wait()
+        if self.writer_error is not None:
+            raise self.writer_error
+        visited_log.flush()
+    
+    def checkpoint_files(self):
+        """
+        Get the files a checkpoint records the length of.
+        
+        Returns:
+            dict: Checkpoint key to file path.
+        """
+        return {
+            'visited_log': self.visited_log_path,
+            'pages': self.pages_path,
+            'text': self.text_path,
+        }
+    
+    def load_checkpoint(self):
+        """
+        Restore the state of an interrupted crawl, if there is one.
+        
+        Output written after the last checkpoint is cut off, so the pages it
+        belongs to are scraped again instead of being half saved.
+        
+        Returns:
+            list: URLs left to visit, or None if there is no checkpoint.
+        """
+        if not os.path.exists(self.frontier_path):
+            return None
+        
+        with open(self.frontier_path, 'rb') as f:
+            checkpoint = json.loads(f.read())
+        
+        for key, path in self.checkpoint_files().items():
+            if os.path.exists(path):
+                os.truncate(path, checkpoint[key])
+        
+        if os.path.exists(self.visited_log_path):
+            with open(self.visited_log_path, 'r', encoding='utf-8') as f:
+                self.visited_urls.update(f.read().splitlines())
+        
+        # Pages saved before the interruption still count for duplicate detection
+        if os.path.exists(self.pages_path):
+            with gzip.open(self.pages_path, 'rb') as f:
+                for line in f:
+                    self.is_duplicate(orjson.loads(line) if orjson else json.loads(line))
+        
+        return checkpoint['frontier']
+    
+    def save_frontier(self, urls):
+        """
+        Checkpoint the URLs still to be scraped, with the current length of
+        every output file.
+        
+        Only call this while the files on disk agree with each other, i.e.
+        after sync_outputs or once the writer has finished.
+        
+        Args:
+            urls: URLs queued or in flight.
+        """
+        checkpoint = {
+            key: os.path.getsize(path) if os.path.exists(path) else 0
+            for key, path in self.checkpoint_files().items()
+        }
+        checkpoint['frontier'] = list(urls)
+        
+        # Write to a temporary file first so a crash never leaves a truncated frontier
+        temp_path = f"{self.frontier_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(dump_json(checkpoint))
+        os.replace(temp_path, self.frontier_path)
+    
+    def recursive_scrape(self, start_url, max_pages=None):
+        """
+        Recursively scrape pages starting from a URL.
+        
+        An interrupted crawl leaves a checkpoint in the output directory
+        (visited.log and frontier.json) and the next run resumes from it
+        instead of starting over from start_url.
+        
+        Args:
+            start_url: The URL to start scraping from.
+            max_pages: Maximum number of pages to scrape (None for no limit).
+            
+        Returns:
+            list: List of all scraped content.
+        """
+        frontier = self.load_checkpoint()
+        resuming = frontier is not None
+        if resuming:
+            print(f"Resuming crawl: {len(self.visited_urls)} pages done, {len(frontier)} queued")
+        else:
+            # Nothing from earlier runs is kept: the writer starts the files afresh
+            frontier = [start_url]
+            for path in self.checkpoint_files().values():
+                if os.path.exists(path):
+                    os.remove(path)
+            self.save_frontier(frontier)
+        
+        to_visit = deque(frontier)
+        queued = {canonicalize(url) for url in to_visit}
+        scraped_content = []
+        visited_count = 0
+        in_flight = set()
+        in_flight_urls = {}
+        failed = []
+        finished = False
+        
+        # Bounded so a slow disk throttles the crawl instead of piling pages up in memory
+        write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.writer_error = None
+        writer = threading.Thread(target=self.write_pages, args=(write_queue, resuming))
+        writer.start()
+        
+        # Append-only log of fetched pages, so a checkpoint never rewrites it
+        visited_log = open(self.visited_log_path, 'a' if resuming else 'w', encoding='utf-8')
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor, \
+                    tqdm(total=1, desc="Scraping pages") as progress_bar:
+                while to_visit or in_flight:
+                    # Keep every worker busy, without overshooting max_pages
+                    while to_visit and len(in_flight) < self.workers and \
+                            (max_pages is None or visited_count + len(in_flight) < max_pages):
+                        current_url = urldefrag(to_visit.popleft()).url
+                        key = canonicalize(current_url)
+                        
+                        if key in self.visited_urls:
+                            continue
+                        
+                        self.visited_urls.add(key)
+                        print(f"Scraping: {current_url}")
+                        future = executor.submit(self.fetch_page, current_url)
+                        in_flight.add(future)
+                        in_flight_urls[future] = current_url
+                    
+                    if not in_flight:
+                        break
+                    
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        content = future.result()
+                        current_url = in_flight_urls.pop(future)
+                        
+                        # Failed pages stay out of the log and are checkpointed with the
+                        # frontier, so a resumed crawl retries them
+                        if content:
+                            visited_log.write(canonicalize(current_url) + '\n')
+                        else:
+                            failed.append(current_url)
+                        
+                        # Pages whose content was already scraped are neither saved nor followed
+                        if content and not self.is_duplicate(content):
+                            # Stop crawling as soon as pages can no longer be saved
+                            if self.writer_error is not None:
+                                raise self.writer_error
+                            write_queue.put(content)
+                            scraped_content.append(content)
+                            visited_count += 1
+                            
+                            # Add new links to visit, using the set for O(1) membership checks
+                            for link in content['links']:
+                                key = canonicalize(link)
+                                if key not in self.visited_urls and key not in queued:
+                                    to_visit.append(link)
+                                    queued.add(key)
+                            
+                            if visited_count % CHECKPOINT_INTERVAL == 0:
+                                self.sync_outputs(write_queue, visited_log)
+                                self.save_frontier([*failed, *in_flight_urls.values(), *to_visit])
+                        
+                        progress_bar.update(1)
+                    
+                    progress_bar.total = len(to_visit) + len(in_flight) + visited_count
+                    progress_bar.refresh()
+            
+            finished = True
+        finally:
+            # Flush pending writes before the combined output reads them back
+            write_queue.put(None)
+            writer.join()
+            visited_log.close()
+            
+            # A crawl that ran to completion (or to max_pages) needs no checkpoint;
+            # an interrupted one keeps the remaining frontier, unless the writer
+            # failed and the last checkpoint is the only consistent one
+            if finished:
+                os.remove(self.frontier_path)
+                os.remove(self.visited_log_path)
+            elif self.writer_error is None:
+                self.save_frontier([*failed, *in_flight_urls.values(), *to_visit])
+        
+        if self.writer_error is not None:
+            raise self.writer_error
+        
+        print(f"Scraped {visited_count} pages.")
+        return scraped_content
+    
+    def create_combined_output(self):
+        """
+        Create combined output files with all content.
+        
+        all_content.txt is written while scraping; this builds all_content.json
+        from the pages streamed to pages.jsonl.gz.
+        """
+        # Stream the JSON lines into one array, so pages are neither parsed
+        # again nor held in memory together
+        page_count = 0
+        pages_path = self.pages_path
+        
+        with self.open_output(f"{self.output_dir}/all_content.json", 'wb',
+                              buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(b'[')
+            if os.path.exists(pages_path):
+                with gzip.open(pages_path, 'rb') as pages:
+                    for line in pages:
+                        f.write(b',\n' if page_count else b'\n')
+                        f.write(line.rstrip(b'\n'))
+                        page_count += 1
+            f.write(b'\n]\n')
+        
+        print(f"Created combined output files in {self.output_dir}/")
+        suffix = '.gz' if self.compress else ''
+        print(f"  - all_content.json{suffix} ({page_count} pages)")
+        print(f"  - all_content.txt{suffix}")
+
+
+def main():
+    """Main execution function with error handling."""
+    
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description='Scrape QuickBuild documentation wiki.')
+    parser.add_argument('--url', default=BASE_URL,
+                        help='Starting URL for scraping.')
+    parser.add_argument('--output', default=OUTPUT_DIR,
+                        help='Output directory for scraped content.')
+    parser.add_argument('--single', action='store_true', 
+                        help='Scrape only a single page (for testing).')
+    parser.add_argument('--max_pages', type=int, default=None,
+                        help='Maximum number of pages to scrape.')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='Number of pages to fetch concurrently.')
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND,
+                        help='Maximum number of requests per second.')
+    parser.add_argument('--compress', action='store_true',
+                        help='Gzip the per-page and combined output files.')
+    
+    args = parser.parse_args()
+    
+    try:
+        # Initialize scraper
+        scraper = QuickBuildScraper(base_url=args.url, output_dir=args.output,
+                                    workers=args.workers, rate=args.rate,
+                                    compress=args.compress)
+        
+        # Scrape
+        if args.single:
+            print(f"Scraping single page: {args.url}")
+            scraper.scrape_page(args.url)
+        else:
+            print(f"Recursively scraping from: {args.url}")
+            scraper.recursive_scrape(args.url, args.max_pages)
+            scraper.create_combined_output()
+        
+        print(f"Scraping complete. Content saved to {args.output}/")
+        
+    except Exception as e:
+        print("--- SCRIPT FAILED WITH AN ERROR ---")
+        exc_type, exc_obj, exc_tb = sys.exc_info()
+        fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+        print(f"ERROR TYPE: {exc_type}\nIN FILE: {fname}\nAT LINE: {exc_tb.tb_lineno}\nDETAILS: {e}")
+        print("-----------------------------------")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file